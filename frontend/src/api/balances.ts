@@ -1,4 +1,5 @@
-import { useQuery, UseQueryResult } from "@tanstack/react-query";
+import { useCallback, useMemo } from "react";
+import { useInfiniteQuery } from "@tanstack/react-query";
 import { fetchJSON } from "./api";
 
 export interface BeanTabBalance {
@@ -29,12 +30,63 @@ export interface BalancesData {
   balanceErrors?: BalanceErrorItem[];
 }
 
-export function useBalances(): UseQueryResult<BalancesData> {
-  const params = new URLSearchParams(location.search);
-  const url = `balances?${params}`;
+interface BalancesPage extends BalancesData {
+  /** Cursor for the next (older) chunk of dates, null when all dates are loaded */
+  nextCursor?: string | null;
+}
+
+/** Number of balance dates requested per chunk */
+export const BALANCE_DATES_PAGE_SIZE = 50;
+
+export interface BalancesResult {
+  data?: BalancesData;
+  isLoading: boolean;
+  error: Error | null;
+  hasOlderDates: boolean;
+  isFetchingOlderDates: boolean;
+  fetchOlderDates: () => void;
+}
 
-  return useQuery({
+/**
+ * Fetch balances newest dates first; older dates are loaded in chunks on demand
+ * via fetchOlderDates.
+ */
+export function useBalances(): BalancesResult {
+  const query = useInfiniteQuery({
     queryKey: ['balances'],
-    queryFn: () => fetchJSON<BalancesData>(url),
+    queryFn: ({ pageParam }) => {
+      const params = new URLSearchParams(location.search);
+      params.set("limit", String(BALANCE_DATES_PAGE_SIZE));
+      if (pageParam) params.set("before", pageParam);
+      return fetchJSON<BalancesPage>(`balances?${params}`);
+    },
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.nextCursor ?? undefined,
   });
+
+  const pages = query.data?.pages;
+  const data = useMemo<BalancesData | undefined>(() => {
+    if (!pages || pages.length === 0) return undefined;
+    // Pages arrive newest first; keep balances in ascending date order.
+    const ordered = [...pages].reverse();
+    return {
+      balances: ordered.flatMap((p) => p.balances),
+      accounts: pages[0].accounts,
+      balanceErrors: ordered.flatMap((p) => p.balanceErrors ?? []),
+    };
+  }, [pages]);
+
+  const { fetchNextPage, hasNextPage, isFetchingNextPage } = query;
+  const fetchOlderDates = useCallback(() => {
+    if (hasNextPage && !isFetchingNextPage) void fetchNextPage();
+  }, [fetchNextPage, hasNextPage, isFetchingNextPage]);
+
+  return {
+    data,
+    isLoading: query.isLoading,
+    error: query.error,
+    hasOlderDates: hasNextPage,
+    isFetchingOlderDates: isFetchingNextPage,
+    fetchOlderDates,
+  };
 }
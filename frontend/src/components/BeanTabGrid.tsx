@@ -1,4 +1,4 @@
-import React, { useMemo } from "react";
+import React, { useCallback, useEffect, useMemo, useRef } from "react";
 import { observer } from "mobx-react-lite";
 import {
   ColumnDataSchemaModel,
@@ -20,8 +20,10 @@ import AccountTreeIcon from "@mui/icons-material/AccountTree";
 import AccountBalanceWalletIcon from "@mui/icons-material/AccountBalanceWallet";
 import TuneIcon from "@mui/icons-material/Tune";
 import RestoreIcon from "@mui/icons-material/Restore";
+import HistoryIcon from "@mui/icons-material/History";
 import type { BalancesData } from "../api/balances";
 import { BALANCE_TYPE_DISPLAY_MAPPING } from "../constants/balanceTypes";
+import { useGridModel } from "../workers/gridModelClient";
 import { BalanceTypeChip } from "./BalanceTypeChip";
 import {
   getColorFromHashString,
@@ -46,8 +48,15 @@ interface BeanTabGridProps {
   hideAccountsWithNoEntries?: boolean;
   sortingConfig?: { prop: string | null, order: "asc" | "desc" | undefined };
   onSortingChange?: (prop: string | null, order?: "asc" | "desc") => void;
+  hasOlderDates?: boolean;
+  isFetchingOlderDates?: boolean;
+  onFetchOlderDates?: () => void;
 }
 
+const DATE_COLUMN_SIZE = 140;
+/** Load older dates when scrolled within this many pixels of the left edge */
+const FETCH_OLDER_DATES_SCROLL_THRESHOLD = 2 * DATE_COLUMN_SIZE;
+
 const StatusContainer: React.FC<{ children: React.ReactNode }> = ({ children }) => (
   <Box
     sx={{
@@ -324,9 +333,12 @@ const BeanTabGrid: React.FC<BeanTabGridProps> = ({
   hideAccountsWithNoEntries = false,
   sortingConfig,
   onSortingChange,
+  hasOlderDates = false,
+  isFetchingOlderDates = false,
+  onFetchOlderDates,
 }) => {
-  let transformedData: GridRow[] = [];
-  let columns: (ColumnRegular | ColumnGrouping)[] = [];
+  const gridRef = useRef<any>(null);
+  const fetchingOlderFromDateRef = useRef<string | null>(null);
   const { balanceErrorKeys, balanceErrorMessages } = useMemo(() => {
     const errors = balancesData?.balanceErrors ?? [];
     const keys = new Set(errors.map((e) => `${e.account}|${e.currency}|${e.date}`));
@@ -338,131 +350,19 @@ const BeanTabGrid: React.FC<BeanTabGridProps> = ({
     return { balanceErrorKeys: keys, balanceErrorMessages: messages };
   }, [balancesData?.balanceErrors]);
 
-  if (balancesData) {
-    const { balances, accounts } = balancesData;
-    const additionalDatesSet = new Set(
-      (additionalDates ?? []).map((d) => d.trim()).filter((d) => d.length > 0),
-    );
-
-    const filteredBalancesData =
-      accountsFilter && accountsFilter.length > 0
-        ? balances.filter((b) => accountsFilter.some((re) => re.test(b.account)))
-        : balances;
-
-    // Collect all unique dates and sort them
-    const allDates = new Set<string>();
-    filteredBalancesData.forEach((balance) => {
-      allDates.add(balance.date);
-    });
-    beanTabStore.getAllModifiedCells().forEach((cell) => {
-      allDates.add(cell.date);
-    });
-    additionalDatesSet.forEach((d) => allDates.add(d));
-    const sortedDates = Array.from(allDates).sort();
-
-    // Compute number of distinct accounts with a value per date (dedupe currencies)
-    const accountsByDate = new Map<string, Set<string>>();
-    for (const b of filteredBalancesData) {
-      if (b.number === null || b.number === undefined) continue;
-      let s = accountsByDate.get(b.date);
-      if (!s) {
-        s = new Set<string>();
-        accountsByDate.set(b.date, s);
-      }
-      s.add(b.account);
-    }
-
-    const effectiveDates =
-      hideDatesWithLessThanEntries <= 0
-        ? sortedDates
-        : sortedDates.filter((date) => {
-            if (additionalDatesSet.has(date)) return true;
-            const entryCount = accountsByDate.get(date)?.size ?? 0;
-            return entryCount >= hideDatesWithLessThanEntries;
-          });
-
-    const defaultBalanceTypeByAccount = new Map(
-      accounts.map((account) => [account.account, account.defaultBalanceType]),
-    );
-
-    // Group balances by (account, currency) pairs
-    const groupedBalances = new Map<string, typeof balances>();
-    filteredBalancesData.forEach((balance) => {
-      const key = `${balance.account}|${balance.currency}`;
-      if (!groupedBalances.has(key)) {
-        groupedBalances.set(key, []);
-      }
-      groupedBalances.get(key)!.push(balance);
-    });
-
-    // Transform data for RevoGrid from balances
-    transformedData = Array.from(groupedBalances.entries()).map(([key, balList]) => {
-      const [account, currency] = key.split("|");
-      const row: GridRow = {
-        account,
-        currency,
-        defaultBalanceType: defaultBalanceTypeByAccount.get(account) || "",
-      };
-
-      effectiveDates.forEach((date) => {
-        const balance = balList.find((b) => b.date === date);
-        if (!balance) {
-          row[date] = null;
-          return;
-        }
-
-        const typeKey = balance.type;
-        const defaultType = defaultBalanceTypeByAccount.get(account);
-        const symbol = typeKey ? BALANCE_TYPE_DISPLAY_MAPPING[typeKey]?.symbol : null;
-        const shouldAnnotate = symbol && defaultType && typeKey !== defaultType;
-
-        row[date] = shouldAnnotate ? `${balance.number}${symbol}` : balance.number;
-      });
-
-      return row;
-    });
-
-    // Extend with rows from accounts (each account × each currency) not already present
-    const existingKeys = new Set(transformedData.map((r) => `${r.account}|${r.currency}`));
-    for (const acc of accounts) {
-      if (accountsFilter?.length && !accountsFilter.some((re) => re.test(acc.account))) continue;
-      const currencies = acc.currencies ?? [];
-      for (const currency of currencies) {
-        const key = `${acc.account}|${currency}`;
-        if (existingKeys.has(key)) continue;
-        existingKeys.add(key);
-        const row: GridRow = {
-          account: acc.account,
-          currency,
-          defaultBalanceType: defaultBalanceTypeByAccount.get(acc.account) || "",
-        };
-        effectiveDates.forEach((date) => {
-          row[date] = null;
-        });
-        transformedData.push(row);
-      }
-    }
-
-    // Overlay any pending edited values
-    const modifiedCells = beanTabStore.getAllModifiedCells();
-
-    const rowLookup = new Map<string, GridRow>();
-    transformedData.forEach((row) => {
-      rowLookup.set(`${row.account}|${row.currency}`, row);
-    });
-
-    for (const cell of modifiedCells) {
-      const row = rowLookup.get(`${cell.account}|${cell.currency}`);
-      if (!row) continue;
-      const symbol = cell.balanceType ? BALANCE_TYPE_DISPLAY_MAPPING[cell.balanceType]?.symbol : null;
-      row[cell.date] = symbol ? `${cell.newValue}${symbol}` : cell.newValue;
-    }
-    if (hideAccountsWithNoEntries) {
-      transformedData = transformedData.filter((row) =>
-        effectiveDates.some((date) => row[date] !== null && row[date] !== undefined),
-      );
-    }
-
+  // Filtering, date columns and row building run in a Web Worker
+  const { rows: transformedData, dates, isBuilding } = useGridModel(balancesData, {
+    accountFilters: (accountsFilter ?? []).map((re) => ({ source: re.source, flags: re.flags })),
+    additionalDates: additionalDates ?? [],
+    modifiedCells: beanTabStore.getAllModifiedCells(),
+    hideDatesWithLessThanEntries,
+    hideAccountsWithNoEntries,
+  });
+
+  const sortProp = sortingConfig?.prop;
+  const sortOrder = sortingConfig?.order;
+  const columns: (ColumnRegular | ColumnGrouping)[] = useMemo(() => {
+    const sortingConfig = { prop: sortProp, order: sortOrder };
     const accountColumn = {
       prop: "account",
       name: "Account",
@@ -477,7 +377,7 @@ const BeanTabGrid: React.FC<BeanTabGridProps> = ({
       ...(sortingConfig && sortingConfig.prop === "account" ? { order: sortingConfig.order } : {}),
     };
 
-    columns = [
+    return [
       accountColumn,
       {
         prop: "defaultBalanceType",
@@ -524,18 +424,35 @@ const BeanTabGrid: React.FC<BeanTabGridProps> = ({
         readonly: true,
         ...(sortingConfig && sortingConfig.prop === "currency" ? { order: sortingConfig.order } : {}),
       },
-      ...effectiveDates.map((date) => ({
+      ...dates.map((date) => ({
         prop: date,
         name: date,
-        size: 140,
+        size: DATE_COLUMN_SIZE,
         sortable: false,
         // columnType: "number",
         columnTemplate: Template(CalendarColumnHeader),
         cellTemplate: Template(BalanceCell),
       })),
     ];
-  }
-  
+  }, [dates, sortProp, sortOrder]);
+
+  const fetchOlderDates = useCallback(() => {
+    if (!hasOlderDates || isFetchingOlderDates || !onFetchOlderDates) return;
+    fetchingOlderFromDateRef.current = dates[0] ?? null;
+    onFetchOlderDates();
+  }, [dates, hasOlderDates, isFetchingOlderDates, onFetchOlderDates]);
+
+  // Keep the previously leftmost date in view when older columns are prepended
+  useEffect(() => {
+    const previousFirstDate = fetchingOlderFromDateRef.current;
+    if (!previousFirstDate || isBuilding || !gridRef.current) return;
+    const index = dates.indexOf(previousFirstDate);
+    if (index > 0) {
+      fetchingOlderFromDateRef.current = null;
+      gridRef.current.scrollToColumnIndex(index);
+    }
+  }, [dates, isBuilding]);
+
   if (isLoading) {
     return (
       <StatusContainer>
@@ -557,6 +474,17 @@ const BeanTabGrid: React.FC<BeanTabGridProps> = ({
     );
   }
 
+  if (!transformedData.length && isBuilding) {
+    return (
+      <StatusContainer>
+        <CircularProgress />
+        <Typography variant="body2" color="text.secondary">
+          Preparing table...
+        </Typography>
+      </StatusContainer>
+    );
+  }
+
   if (!transformedData.length) {
     return (
       <StatusContainer>
@@ -572,6 +500,27 @@ const BeanTabGrid: React.FC<BeanTabGridProps> = ({
 
   return (
       <Box sx={{ position: "relative", height: "700px", width: "100%" }}>
+        {isFetchingOlderDates ? (
+          <CircularProgress
+            size={16}
+            sx={{ position: "absolute", bottom: 16, left: 16, zIndex: 1 }}
+            aria-label="Loading older dates"
+          />
+        ) : (
+          hasOlderDates && (
+            // Few columns (e.g. narrow filter) leave nothing to scroll
+            <Tooltip title="Load older dates">
+              <IconButton
+                size="small"
+                onClick={fetchOlderDates}
+                sx={{ position: "absolute", bottom: 8, left: 8, zIndex: 1 }}
+                aria-label="Load older dates"
+              >
+                <HistoryIcon fontSize="small" />
+              </IconButton>
+            </Tooltip>
+          )
+        )}
         <Box sx={{ height: "100%", width: "100%", padding: 1 }}>
           <RevoGrid
           grouping={
@@ -644,8 +593,15 @@ const BeanTabGrid: React.FC<BeanTabGridProps> = ({
             }
           }}
           onAftergridinit={(e: any) => {
+            gridRef.current = e.target;
             e.target.scrollToColumnIndex(columns.length-1);
           }}
+          onViewportscroll={(e: any) => {
+            const { dimension, coordinate } = e?.detail ?? {};
+            if (dimension === "rgCol" && coordinate < FETCH_OLDER_DATES_SCROLL_THRESHOLD) {
+              fetchOlderDates();
+            }
+          }}
         />
         </Box>
       </Box>
@@ -96,7 +96,14 @@ const Dashboard: React.FC = () => {
     const navigate = useNavigate();
     const searchParams = useSearch({ strict: false }) as SearchParams;
     const { accountFilter, sortProp, sortOrder } = searchParams;
-    const { data: balancesData, isLoading, error } = useBalances();
+    const {
+        data: balancesData,
+        isLoading,
+        error,
+        hasOlderDates,
+        isFetchingOlderDates,
+        fetchOlderDates,
+    } = useBalances();
     const [accountFilterInput, setAccountFilterInput] = useState<string>("");
     const [additionalDatesInput, setAdditionalDatesInput] = useState<string>("");
     const [settingsOpen, setSettingsOpen] = useState(false);
@@ -299,6 +306,9 @@ const Dashboard: React.FC = () => {
                         hideAccountsWithNoEntries={hideAccountsWithNoEntries}
                         sortingConfig={sortingConfig}
                         onSortingChange={setSorting}
+                        hasOlderDates={hasOlderDates}
+                        isFetchingOlderDates={isFetchingOlderDates}
+                        onFetchOlderDates={fetchOlderDates}
                     />
 
                     <TableEditControls />
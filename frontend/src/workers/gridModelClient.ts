@@ -0,0 +1,209 @@
+import { useEffect, useMemo, useRef, useState } from "react";
+import type { BalancesData } from "../api/balances";
+import { BALANCE_TYPE_DISPLAY_MAPPING } from "../constants/balanceTypes";
+import type { GridRow } from "../stores/beanTabStore";
+import {
+  gridModelWorkerMain,
+  type EncodedBalances,
+  type GridModelParams,
+  type GridModelRequest,
+  type GridModelResponse,
+  type GridModelScope,
+} from "./gridModelWorker";
+
+interface GridModelPort {
+  postMessage(message: GridModelRequest, transfer?: Transferable[]): void;
+  onmessage: ((event: MessageEvent<GridModelResponse>) => void) | null;
+  onerror: ((event: Event) => void) | null;
+  terminate(): void;
+}
+
+/**
+ * Start the grid model worker from an inline blob (the extension is served as a single
+ * bundle, so there is no separate worker script to point at).
+ */
+function createWorkerPort(): GridModelPort {
+  const source = `(${gridModelWorkerMain.toString()})(self);`;
+  const url = URL.createObjectURL(new Blob([source], { type: "text/javascript" }));
+  const worker = new Worker(url);
+  URL.revokeObjectURL(url);
+  return worker as unknown as GridModelPort;
+}
+
+/** Run the same code on the main thread over a MessageChannel. */
+function createMainThreadPort(): GridModelPort {
+  const channel = new MessageChannel();
+  gridModelWorkerMain(channel.port2 as unknown as GridModelScope);
+  channel.port1.start();
+  channel.port2.start();
+  return {
+    postMessage: (message, transfer) => channel.port1.postMessage(message, transfer ?? []),
+    set onmessage(handler) {
+      channel.port1.onmessage = handler;
+    },
+    get onmessage() {
+      return channel.port1.onmessage;
+    },
+    onerror: null,
+    terminate: () => {
+      channel.port1.close();
+      channel.port2.close();
+    },
+  };
+}
+
+function postLoad(port: GridModelPort, balancesData: BalancesData) {
+  const encoded = encodeBalances(balancesData);
+  port.postMessage({ type: "load", balances: encoded }, [
+    encoded.accountIdx.buffer,
+    encoded.currencyIdx.buffer,
+    encoded.dateIdx.buffer,
+    encoded.typeIdx.buffer,
+    encoded.numbers.buffer,
+  ]);
+}
+
+function internString(table: string[], index: Map<string, number>, value: string): number {
+  let idx = index.get(value);
+  if (idx === undefined) {
+    idx = table.length;
+    table.push(value);
+    index.set(value, idx);
+  }
+  return idx;
+}
+
+/** Convert the balances payload to columnar typed arrays for transfer to the worker. */
+export function encodeBalances(balancesData: BalancesData): EncodedBalances {
+  const { balances, accounts } = balancesData;
+  const n = balances.length;
+  const tables = {
+    account: { names: [] as string[], index: new Map<string, number>() },
+    currency: { names: [] as string[], index: new Map<string, number>() },
+    date: { names: [] as string[], index: new Map<string, number>() },
+    type: { names: [] as string[], index: new Map<string, number>() },
+  };
+  const accountIdx = new Int32Array(n);
+  const currencyIdx = new Int32Array(n);
+  const dateIdx = new Int32Array(n);
+  const typeIdx = new Int32Array(n);
+  const numbers = new Float64Array(n);
+
+  for (let i = 0; i < n; i++) {
+    const b = balances[i];
+    accountIdx[i] = internString(tables.account.names, tables.account.index, b.account);
+    currencyIdx[i] = internString(tables.currency.names, tables.currency.index, b.currency);
+    dateIdx[i] = internString(tables.date.names, tables.date.index, b.date);
+    typeIdx[i] = internString(tables.type.names, tables.type.index, b.type ?? "");
+    numbers[i] = b.number === null || b.number === undefined ? Number.NaN : b.number;
+  }
+
+  const typeSymbols: Record<string, string> = {};
+  for (const [key, { symbol }] of Object.entries(BALANCE_TYPE_DISPLAY_MAPPING)) {
+    typeSymbols[key] = symbol;
+  }
+
+  return {
+    accountNames: tables.account.names,
+    currencyNames: tables.currency.names,
+    dateNames: tables.date.names,
+    typeNames: tables.type.names,
+    accountIdx,
+    currencyIdx,
+    dateIdx,
+    typeIdx,
+    numbers,
+    accounts,
+    typeSymbols,
+  };
+}
+
+export interface GridModel {
+  rows: GridRow[];
+  dates: string[];
+  /** True until the last chunk of the current build has arrived */
+  isBuilding: boolean;
+}
+
+/**
+ * Build grid rows for BeanTabGrid in a Web Worker. The balances payload is sent once per
+ * fetch; parameter changes only trigger a rebuild, whose rows arrive in chunks.
+ */
+export function useGridModel(
+  balancesData: BalancesData | undefined,
+  params: GridModelParams
+): GridModel {
+  const portRef = useRef<GridModelPort | null>(null);
+  const requestIdRef = useRef(0);
+  const pendingRef = useRef<{ requestId: number; rows: GridRow[] }>({ requestId: 0, rows: [] });
+  const [model, setModel] = useState<GridModel>({ rows: [], dates: [], isBuilding: false });
+
+  // Latest inputs, to replay them if the worker has to be replaced by the fallback
+  const balancesDataRef = useRef(balancesData);
+  balancesDataRef.current = balancesData;
+  const lastBuildRef = useRef<GridModelRequest | null>(null);
+
+  useEffect(() => {
+    const handleMessage = (event: MessageEvent<GridModelResponse>) => {
+      const response = event.data;
+      if (response.requestId !== requestIdRef.current) return;
+      // Keep the previous rows on screen until the first chunk of a new build arrives.
+      const pending = pendingRef.current;
+      const rows =
+        pending.requestId === response.requestId
+          ? pending.rows.concat(response.rows)
+          : response.rows;
+      pendingRef.current = { requestId: response.requestId, rows };
+      setModel({ rows, dates: response.dates, isBuilding: !response.done });
+    };
+
+    const fallBackToMainThread = (reason: unknown) => {
+      console.warn("BeanTab: grid worker unavailable, preparing grid on the main thread", reason);
+      portRef.current?.terminate();
+      const port = createMainThreadPort();
+      port.onmessage = handleMessage;
+      portRef.current = port;
+      if (balancesDataRef.current) postLoad(port, balancesDataRef.current);
+      if (lastBuildRef.current) port.postMessage(lastBuildRef.current);
+    };
+
+    try {
+      const port = createWorkerPort();
+      port.onmessage = handleMessage;
+      // e.g. the serialized worker code failing to evaluate
+      port.onerror = (event) => {
+        event.preventDefault();
+        fallBackToMainThread(event);
+      };
+      portRef.current = port;
+    } catch (e) {
+      fallBackToMainThread(e);
+    }
+    return () => {
+      portRef.current?.terminate();
+      portRef.current = null;
+    };
+  }, []);
+
+  useEffect(() => {
+    if (!balancesData || !portRef.current) return;
+    postLoad(portRef.current, balancesData);
+  }, [balancesData]);
+
+  // Params are rebuilt on every render; only rebuild when their content changes.
+  const paramsKey = JSON.stringify(params);
+  const stableParams = useMemo(() => params, [paramsKey]); // eslint-disable-line react-hooks/exhaustive-deps
+
+  useEffect(() => {
+    if (!balancesData || !portRef.current) return;
+    const requestId = ++requestIdRef.current;
+    setModel((prev) => ({ ...prev, isBuilding: true }));
+    const message: GridModelRequest = { type: "build", requestId, params: stableParams };
+    lastBuildRef.current = message;
+    portRef.current.postMessage(message);
+  }, [balancesData, stableParams]);
+
+  // Before the first build has been requested the grid would otherwise flash "no data".
+  const awaitingFirstBuild = !!balancesData && pendingRef.current.requestId === 0;
+  return awaitingFirstBuild ? { ...model, isBuilding: true } : model;
+}
@@ -0,0 +1,202 @@
+/**
+ * Grid data preparation (account filtering, date columns, row building) for BeanTabGrid.
+ *
+ * `gridModelWorkerMain` is serialized with `Function.prototype.toString()` and evaluated
+ * inside a Web Worker (see gridModelClient.ts), so it must stay self-contained: no
+ * references to imports or module-level values, only to types.
+ */
+import type { GridRow, ModifiedCell } from "../stores/beanTabStore";
+import type { BeanTabAccount } from "../api/balances";
+
+/** Balances payload in columnar form; typed arrays are transferred to the worker. */
+export interface EncodedBalances {
+  accountNames: string[];
+  currencyNames: string[];
+  dateNames: string[];
+  typeNames: string[];
+  accountIdx: Int32Array;
+  currencyIdx: Int32Array;
+  dateIdx: Int32Array;
+  typeIdx: Int32Array;
+  /** NaN where the balance has no number */
+  numbers: Float64Array;
+  accounts: BeanTabAccount[];
+  /** Balance type -> display symbol, e.g. { padded: "~" } */
+  typeSymbols: Record<string, string>;
+}
+
+export interface GridModelParams {
+  accountFilters: { source: string; flags: string }[];
+  additionalDates: string[];
+  modifiedCells: ModifiedCell[];
+  hideDatesWithLessThanEntries: number;
+  hideAccountsWithNoEntries: boolean;
+}
+
+export type GridModelRequest =
+  | { type: "load"; balances: EncodedBalances }
+  | { type: "build"; requestId: number; params: GridModelParams };
+
+export interface GridModelResponse {
+  type: "rows";
+  requestId: number;
+  /** Date columns to show, sorted ascending; identical in every chunk of one build */
+  dates: string[];
+  rows: GridRow[];
+  done: boolean;
+}
+
+export interface GridModelScope {
+  postMessage(message: GridModelResponse): void;
+  onmessage: ((event: MessageEvent<GridModelRequest>) => void) | null;
+}
+
+export function gridModelWorkerMain(scope: GridModelScope): void {
+  const ROWS_PER_CHUNK = 500;
+
+  let balances: EncodedBalances | null = null;
+  let latestRequestId = 0;
+
+  const yieldToEventLoop = () => new Promise<void>((resolve) => setTimeout(resolve, 0));
+
+  const build = async (requestId: number, params: GridModelParams) => {
+    if (!balances) return;
+    const data = balances;
+    const isStale = () => requestId !== latestRequestId || data !== balances;
+    const count = data.numbers.length;
+
+    const filters = params.accountFilters.map((f) => new RegExp(f.source, f.flags));
+    const matchesFilter = (account: string) =>
+      filters.length === 0 || filters.some((re) => re.test(account));
+    const accountMatches = data.accountNames.map(matchesFilter);
+
+    const additionalDatesSet = new Set(
+      params.additionalDates.map((d) => d.trim()).filter((d) => d.length > 0)
+    );
+
+    // Collect all unique dates and count distinct accounts with a value per date
+    const usedDateIdx = new Set<number>();
+    const accountsByDate = new Map<number, Set<number>>();
+    for (let i = 0; i < count; i++) {
+      if (!accountMatches[data.accountIdx[i]]) continue;
+      const dateIdx = data.dateIdx[i];
+      usedDateIdx.add(dateIdx);
+      if (Number.isNaN(data.numbers[i])) continue;
+      let s = accountsByDate.get(dateIdx);
+      if (!s) {
+        s = new Set<number>();
+        accountsByDate.set(dateIdx, s);
+      }
+      s.add(data.accountIdx[i]);
+    }
+    const entryCountByDate = new Map<string, number>();
+    for (const [dateIdx, s] of accountsByDate) {
+      entryCountByDate.set(data.dateNames[dateIdx], s.size);
+    }
+
+    const allDates = new Set<string>();
+    usedDateIdx.forEach((dateIdx) => allDates.add(data.dateNames[dateIdx]));
+    params.modifiedCells.forEach((cell) => allDates.add(cell.date));
+    additionalDatesSet.forEach((d) => allDates.add(d));
+    const sortedDates = Array.from(allDates).sort();
+
+    const threshold = params.hideDatesWithLessThanEntries;
+    const effectiveDates =
+      threshold <= 0
+        ? sortedDates
+        : sortedDates.filter(
+            (date) => additionalDatesSet.has(date) || (entryCountByDate.get(date) ?? 0) >= threshold
+          );
+
+    const defaultBalanceTypeByAccount = new Map(
+      data.accounts.map((account) => [account.account, account.defaultBalanceType])
+    );
+
+    // Group balances by (account, currency) pairs, keeping the first balance per date
+    const groups = new Map<string, { account: string; currency: string; byDate: Map<string, number> }>();
+    for (let i = 0; i < count; i++) {
+      if (!accountMatches[data.accountIdx[i]]) continue;
+      const account = data.accountNames[data.accountIdx[i]];
+      const currency = data.currencyNames[data.currencyIdx[i]];
+      const key = `${account}|${currency}`;
+      let group = groups.get(key);
+      if (!group) {
+        group = { account, currency, byDate: new Map() };
+        groups.set(key, group);
+      }
+      const date = data.dateNames[data.dateIdx[i]];
+      if (!group.byDate.has(date)) group.byDate.set(date, i);
+    }
+
+    // Extend with rows from accounts (each account × each currency) not already present
+    for (const acc of data.accounts) {
+      if (!matchesFilter(acc.account)) continue;
+      for (const currency of acc.currencies ?? []) {
+        const key = `${acc.account}|${currency}`;
+        if (groups.has(key)) continue;
+        groups.set(key, { account: acc.account, currency, byDate: new Map() });
+      }
+    }
+
+    const modifiedByRow = new Map<string, ModifiedCell[]>();
+    for (const cell of params.modifiedCells) {
+      const key = `${cell.account}|${cell.currency}`;
+      const list = modifiedByRow.get(key);
+      if (list) list.push(cell);
+      else modifiedByRow.set(key, [cell]);
+    }
+
+    let chunk: GridRow[] = [];
+    for (const [key, group] of groups) {
+      const { account, currency, byDate } = group;
+      const defaultType = defaultBalanceTypeByAccount.get(account);
+      const row: GridRow = { account, currency, defaultBalanceType: defaultType || "" };
+
+      for (const date of effectiveDates) {
+        const i = byDate.get(date);
+        if (i === undefined) {
+          row[date] = null;
+          continue;
+        }
+        const typeKey = data.typeNames[data.typeIdx[i]];
+        const number = Number.isNaN(data.numbers[i]) ? null : data.numbers[i];
+        const symbol = typeKey ? data.typeSymbols[typeKey] : null;
+        const shouldAnnotate = symbol && defaultType && typeKey !== defaultType;
+        row[date] = shouldAnnotate ? `${number}${symbol}` : number;
+      }
+
+      // Overlay any pending edited values
+      for (const cell of modifiedByRow.get(key) ?? []) {
+        const symbol = cell.balanceType ? data.typeSymbols[cell.balanceType] : null;
+        row[cell.date] = symbol ? `${cell.newValue}${symbol}` : cell.newValue;
+      }
+
+      if (
+        params.hideAccountsWithNoEntries &&
+        !effectiveDates.some((date) => row[date] !== null && row[date] !== undefined)
+      ) {
+        continue;
+      }
+
+      chunk.push(row);
+      if (chunk.length >= ROWS_PER_CHUNK) {
+        scope.postMessage({ type: "rows", requestId, dates: effectiveDates, rows: chunk, done: false });
+        chunk = [];
+        // Let newer requests arrive; abandon this build if superseded
+        await yieldToEventLoop();
+        if (isStale()) return;
+      }
+    }
+    scope.postMessage({ type: "rows", requestId, dates: effectiveDates, rows: chunk, done: true });
+  };
+
+  scope.onmessage = (event) => {
+    const message = event.data;
+    if (message.type === "load") {
+      balances = message.balances;
+    } else if (message.type === "build") {
+      latestRequestId = message.requestId;
+      void build(message.requestId, message.params);
+    }
+  };
+}
@@ -1,67 +1,37 @@
-from collections import defaultdict
+"""BeanTab Fava extension.
+
+Fava imports this module when it discovers the extension, so only what is needed to
+register it is imported here. Ledger parsing and beancount-lazy-plugins code is
+imported on first endpoint use (see balances.py and BeantabFileManager.py).
+"""
+from bisect import bisect_left
+import datetime
 import functools
 import logging
-import subprocess
+import re
 import traceback
-from dataclasses import dataclass, asdict
+from dataclasses import asdict
 from pathlib import Path
-from typing import Dict, List, NamedTuple, Optional
-
-from beancount import Amount
-from beancount.core import data
-from beancount.core.interpolate import BalanceError as BeancountBalanceError
-from beancount_lazy_plugins.balance_extended.common import (
-    BalanceType,
-    BalanceExtendedError,
-    build_account_currencies_mapping,
-    ensure_account_balance_type,
-    get_directives_defined_config,
-    parse_balance_extended_entry,
-)
-from beancount_lazy_plugins.valuation.common import (
-    ValuationError,
-    parse_valuation_entry,
-)
+from typing import TYPE_CHECKING, List, NamedTuple, Optional
+
 from fava.ext import FavaExtensionBase
 from fava.ext import extension_endpoint
 from fava.helpers import FavaAPIError
 from flask import request
-from .BeantabFileManager import BeantabFileManager
 from .models import ModifiedCellData
-from .utils import is_original_entry
-
-logger = logging.getLogger(__name__)
-
-
-@dataclass
-class BeanTabBalance:
-    """Represents a balance statement for an account."""
-    account: str  # account name
-    currency: str  # currency from the amount
-    date: str  # date in ISO format
-    number: float  # number from the amount
-    type: BalanceType
 
-    def to_dict(self) -> dict:
-        data_dict = asdict(self)
-        data_dict["type"] = self.type.value
-        return data_dict
+if TYPE_CHECKING:
+    from .balances import BalancesIndex
 
+logger = logging.getLogger(__name__)
 
-@dataclass
-class BeanTabAccount:
-    account: str
-    defaultBalanceType: str
-    currencies: List[str]
-
-    def to_dict(self) -> dict:
-        return asdict(self)
 
 class ExtConfig(NamedTuple):
     """Configuration for the Beantab extension."""
 
-    # Add configuration options here as needed
-    pass
+    # Endpoint profiling, dumps are written to beantab-profiles/ next to the ledger:
+    # None (off), "once" (first call of each endpoint) or "request" (calls with ?profile=1)
+    profile: Optional[str] = None
 
 
 def api_response(func):
@@ -81,21 +51,61 @@ def api_response(func):
     return decorator
 
 
+def profiled(func):
+    """Profile the endpoint call as configured by the ``profile`` extension option."""
+
+    @functools.wraps(func)
+    def decorator(self, *args, **kwargs):
+        if not self.should_profile(func.__name__):
+            return func(self, *args, **kwargs)
+
+        from .profiling import PROFILE_DIR_NAME  # pylint: disable=import-outside-toplevel
+        from .profiling import profile_call  # pylint: disable=import-outside-toplevel
+
+        dump_dir = Path(self.ledger.beancount_file_path).resolve().parent / PROFILE_DIR_NAME
+        result, _dumps = profile_call(lambda: func(self, *args, **kwargs), dump_dir, func.__name__)
+        return result
+
+    return decorator
+
+
 class BeanTab(FavaExtensionBase):
     """BeanTab Fava extension for enhanced ledger interface."""
 
     report_title = "BeanTab"
     has_js_module = True
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._balances_index: Optional["BalancesIndex"] = None
+        self._profiled_endpoints: set[str] = set()
+
     def after_load_file(self) -> None:
         """Fava hook which runs after a ledger file has been (re-)loaded"""
-        # Clear any cached data here
-        pass
+        self._balances_index = None
+
+    def should_profile(self, endpoint: str) -> bool:
+        """Whether to profile this call of *endpoint*, see ``ExtConfig.profile``."""
+        mode = self.read_ext_config().profile
+        if mode == "once":
+            if endpoint in self._profiled_endpoints:
+                return False
+            self._profiled_endpoints.add(endpoint)
+            return True
+        if mode == "request":
+            return request.args.get("profile") == "1"
+        return False
 
     def read_ext_config(self) -> ExtConfig:
         """Read extension configuration from the ledger file."""
         cfg = self.config if isinstance(self.config, dict) else {}
-        return ExtConfig()
+        profile = cfg.get("profile")
+        if profile is True:
+            profile = "once"
+        if profile not in (None, False, "once", "request"):
+            logger.warning("Unknown BeanTab profile setting %r, profiling disabled", profile)
+            profile = None
+        return ExtConfig(profile=profile or None)
 
 
     @extension_endpoint("reload")
@@ -111,6 +121,8 @@ class BeanTab(FavaExtensionBase):
     @api_response
     def api_safety_check(self):
         """Check that git is available, cwd is a git repo, and working tree is clean."""
+        import subprocess  # pylint: disable=import-outside-toplevel
+
         cwd = Path(self.ledger.beancount_file_path).resolve().parent
         try:
             subprocess.run(
@@ -150,156 +162,114 @@ class BeanTab(FavaExtensionBase):
 
     @extension_endpoint("balances")
     @api_response
+    @profiled
     def api_balances(self):
         """Get balance statements as a flat list.
         Include regular Balance entries, and special balance-like Custom directives
         created/used by plugins (balance-ext, valuation).
+
+        With a ``limit`` query parameter only balances for the newest ``limit`` dates
+        are returned, older than the ``before`` cursor date when given. ``nextCursor``
+        is then the cursor for the next (older) chunk, or null when there is none.
         """
-        entries = self.ledger.all_entries
-        
-        # Convert to flat list of BeanTabBalance objects
-        balances: List[BeanTabBalance] = []
-        config_errors: List[BalanceExtendedError] = []
-        balance_type_config = get_directives_defined_config(entries, config_errors)
-        if config_errors:
-            for err in config_errors:
-                logger.warning("balance-ext config error: %s", err.message)
-        account_to_type_mapping: dict[str, str] = {}
-        default_balance_type = BalanceType.REGULAR.value
-        account_currencies = build_account_currencies_mapping(self.ledger.all_entries)
-        
-        for entry in entries:
-            if isinstance(entry, data.Open):
-                ensure_account_balance_type(
-                    entry.account,
-                    account_to_type_mapping,
-                    balance_type_config,
-                    default_balance_type,
-                )
-            elif isinstance(entry, data.Balance):
-                if not is_original_entry(entry):
-                    continue
-                ensure_account_balance_type(
-                    entry.account,
-                    account_to_type_mapping,
-                    balance_type_config,
-                    default_balance_type,
-                )
-                bean_tab_balance = BeanTabBalance(
-                    account=entry.account,
-                    currency=entry.amount.currency,
-                    date=entry.date.isoformat(),
-                    number=float(entry.amount.number),
-                    type=BalanceType.REGULAR,
-                )
-                balances.append(bean_tab_balance.to_dict())
-
-            elif isinstance(entry, data.Custom) and entry.type == "valuation":
-                if not is_original_entry(entry):
-                    continue
-                try:
-                    parsed = parse_valuation_entry(entry)
-                except ValuationError:
-                    continue
-
-                ensure_account_balance_type(
-                    parsed.account,
-                    account_to_type_mapping,
-                    balance_type_config,
-                    default_balance_type,
-                )
-                bean_tab_balance = BeanTabBalance(
-                    account=parsed.account,
-                    currency=parsed.amount.currency,
-                    date=entry.date.isoformat(),
-                    number=float(parsed.amount.number),
-                    type=BalanceType.VALUATION,
-                )
-                balances.append(bean_tab_balance.to_dict())
-
-            elif isinstance(entry, data.Custom) and entry.type == "balance-ext":
-                if not is_original_entry(entry):
-                    continue
-                try:
-                    parsed = parse_balance_extended_entry(
-                        entry,
-                        account_to_type_mapping,
-                        balance_type_config,
-                        default_balance_type,
-                    )
-                except BalanceExtendedError:
-                    continue
-
-                balance_type_map = {
-                    BalanceType.REGULAR: BalanceType.REGULAR,
-                    BalanceType.FULL: BalanceType.REGULAR,
-                    BalanceType.PADDED: BalanceType.PADDED,
-                    BalanceType.FULL_PADDED: BalanceType.PADDED,
-                    BalanceType.VALUATION: BalanceType.VALUATION,
-                }
-                balance_type_for_display = balance_type_map.get(
-                    parsed.balance_type, BalanceType.PADDED
-                )
-                asserted_amounts = parsed.amount_values
-                if parsed.balance_type in (BalanceType.FULL, BalanceType.FULL_PADDED):
-                    # TODO: proper implementation will need more consideration
-                    continue
-                    # all_currencies = account_currencies.get(parsed.account, set())
-                    # asserted_amounts.extend([Amount(0.0, currency) for currency in all_currencies - set(asserted_amounts)])
-                    
-                for amount_obj in asserted_amounts:
-                    bean_tab_balance = BeanTabBalance(
-                        account=parsed.account,
-                        currency=amount_obj.currency,
-                        date=entry.date.isoformat(),
-                        number=float(amount_obj.number),
-                        type=balance_type_for_display,
-                    )
-                    balances.append(bean_tab_balance.to_dict())
-
-        # Per-account currencies: from Open directive when declared, else from balances
-        account_currencies_list: Dict[str, List[str]] = {}
-        for account in account_to_type_mapping:
-            currencies = account_currencies.get(account, set())
-            if currencies:
-                account_currencies_list[account] = sorted(currencies)
-            else:
-                from_balances = {
-                    b["currency"]
-                    for b in balances
-                    if b["account"] == account
-                }
-                account_currencies_list[account] = sorted(from_balances)
-
-        accounts = [
-            BeanTabAccount(
-                account=account,
-                defaultBalanceType=balance_type,
-                currencies=account_currencies_list.get(account, []),
-            ).to_dict()
-            for account, balance_type in sorted(account_to_type_mapping.items())
-        ]
+        index = self._get_balances_index()
 
-        # Collect BalanceErrors from ledger (balance check failures) for table highlighting
-        balance_errors: List[dict] = []
-        for err in self.ledger.errors:
-            if isinstance(err, BeancountBalanceError) and getattr(err, "entry", None):
-                entry = err.entry
-                balance_errors.append({
-                    "account": entry.account,
-                    "date": entry.date.isoformat(),
-                    "currency": entry.amount.currency if entry.amount else None,
-                    "message": err.message,
-                })
+        limit_arg = request.args.get("limit")
+        if limit_arg is None:
+            return {
+                "balances": [b for date in index.dates for b in index.balances_by_date[date]],
+                "accounts": index.accounts,
+                "balanceErrors": index.balance_errors,
+            }
 
+        try:
+            limit = int(limit_arg)
+        except ValueError as exc:
+            raise FavaAPIError(f"Invalid limit: {limit_arg}") from exc
+        if limit <= 0:
+            raise FavaAPIError("limit must be positive")
+
+        before = request.args.get("before")
+        end = bisect_left(index.dates, before) if before else len(index.dates)
+        start = max(0, end - limit)
+        page_dates = index.dates[start:end]
+        page_dates_set = set(page_dates)
         return {
-            "balances": balances,
-            "accounts": accounts,
-            "balanceErrors": balance_errors,
+            "balances": [b for date in page_dates for b in index.balances_by_date[date]],
+            "accounts": index.accounts,
+            "balanceErrors": [e for e in index.balance_errors if e["date"] in page_dates_set],
+            "nextCursor": page_dates[0] if start > 0 else None,
         }
 
+    @extension_endpoint("history")
+    @api_response
+    @profiled
+    def api_history(self):
+        """Get forward-filled balance series of many accounts, sampled at period ends.
+
+        Query parameters (all optional, ``account`` and ``currency`` may repeat):
+        ``account`` regex patterns, ``currency`` codes, ``start``/``end`` ISO dates
+        (default: first balance date / end of the period holding the last balance) and
+        ``period`` (day, week, month, quarter or year; default month).
+        """
+        from .history import PERIODS  # pylint: disable=import-outside-toplevel
+        from .history import forward_fill  # pylint: disable=import-outside-toplevel
+        from .history import period_end  # pylint: disable=import-outside-toplevel
+        from .history import period_end_dates  # pylint: disable=import-outside-toplevel
+
+        index = self._get_balances_index()
+
+        try:
+            account_patterns = [re.compile(p) for p in request.args.getlist("account")]
+        except re.error as exc:
+            raise FavaAPIError(f"Invalid account pattern: {exc}") from exc
+        currencies = set(request.args.getlist("currency"))
+        period = request.args.get("period", "month")
+        if period not in PERIODS:
+            raise FavaAPIError(f"Invalid period: {period} (expected one of {', '.join(PERIODS)})")
+
+        try:
+            start_arg = request.args.get("start")
+            end_arg = request.args.get("end")
+            start = datetime.date.fromisoformat(start_arg) if start_arg else None
+            end = datetime.date.fromisoformat(end_arg) if end_arg else None
+            if index.dates and start is None:
+                start = datetime.date.fromisoformat(index.dates[0])
+            if index.dates and end is None:
+                # Round up so that the period holding the last balance is included
+                end = period_end(datetime.date.fromisoformat(index.dates[-1]), period)
+            sample_dates: List[str] = []
+            if start is not None and end is not None:
+                # A single bound outside the ledger's range is an empty result; only
+                # explicitly reversed bounds are an error.
+                if start <= end or (start_arg and end_arg):
+                    sample_dates = period_end_dates(start, end, period)
+        except ValueError as exc:
+            raise FavaAPIError(str(exc)) from exc
+
+        series = [
+            {
+                "account": account,
+                "currency": currency,
+                "values": forward_fill(dates, values, sample_dates),
+            }
+            for (account, currency), (dates, values) in sorted(index.series.items())
+            if (not account_patterns or any(p.search(account) for p in account_patterns))
+            and (not currencies or currency in currencies)
+        ]
+        return {"dates": sample_dates, "series": series}
+
+    def _get_balances_index(self) -> "BalancesIndex":
+        """Return balances grouped by date, built once per ledger load."""
+        if self._balances_index is None:
+            from .balances import build_balances_index  # pylint: disable=import-outside-toplevel
+
+            self._balances_index = build_balances_index(self.ledger)
+        return self._balances_index
+
     @extension_endpoint("updateBalances", methods=["POST"])
     @api_response
+    @profiled
     def api_update_balances(self):
         """Log updateBalances payload without applying any changes."""
         if request.method != "POST":
@@ -336,6 +306,8 @@ class BeanTab(FavaExtensionBase):
 
             modified_cells.append(modified_cell)
 
+        from .BeantabFileManager import BeantabFileManager  # pylint: disable=import-outside-toplevel
+
         entries = self.ledger.all_entries
         file_manager = BeantabFileManager(self.ledger)
         saved_cells, errors = file_manager.update_balances(entries, modified_cells)
@@ -0,0 +1,214 @@
+"""Balance statements of the ledger as served by the BeanTab endpoints."""
+
+import logging
+from collections import defaultdict
+from dataclasses import asdict
+from dataclasses import dataclass
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+
+from beancount.core import data
+from beancount.core.interpolate import BalanceError as BeancountBalanceError
+from beancount_lazy_plugins.balance_extended.common import BalanceExtendedError
+from beancount_lazy_plugins.balance_extended.common import BalanceType
+from beancount_lazy_plugins.balance_extended.common import build_account_currencies_mapping
+from beancount_lazy_plugins.balance_extended.common import ensure_account_balance_type
+from beancount_lazy_plugins.balance_extended.common import get_directives_defined_config
+from beancount_lazy_plugins.balance_extended.common import parse_balance_extended_entry
+from beancount_lazy_plugins.valuation.common import ValuationError
+from beancount_lazy_plugins.valuation.common import parse_valuation_entry
+
+from .history import SeriesByKey
+from .history import build_series
+from .utils import is_original_entry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BeanTabBalance:
+    """Represents a balance statement for an account."""
+    account: str  # account name
+    currency: str  # currency from the amount
+    date: str  # date in ISO format
+    number: float  # number from the amount
+    type: BalanceType
+
+    def to_dict(self) -> dict:
+        data_dict = asdict(self)
+        data_dict["type"] = self.type.value
+        return data_dict
+
+
+@dataclass
+class BeanTabAccount:
+    account: str
+    defaultBalanceType: str
+    currencies: List[str]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class BalancesIndex(NamedTuple):
+    """Balances of the loaded ledger, cached between requests."""
+
+    dates: List[str]  # sorted ISO dates that have at least one balance
+    balances_by_date: Dict[str, List[dict]]  # BeanTabBalance dicts per date
+    accounts: List[dict]
+    balance_errors: List[dict]
+    series: SeriesByKey  # (account, currency) -> ascending dates and numbers
+
+
+def build_balances_index(ledger) -> BalancesIndex:
+    """Collect balance statements of the ledger, grouped by date."""
+    entries = ledger.all_entries
+
+    # Flat list of BeanTabBalance dicts
+    balances: List[dict] = []
+    config_errors: List[BalanceExtendedError] = []
+    balance_type_config = get_directives_defined_config(entries, config_errors)
+    if config_errors:
+        for err in config_errors:
+            logger.warning("balance-ext config error: %s", err.message)
+    account_to_type_mapping: dict[str, str] = {}
+    default_balance_type = BalanceType.REGULAR.value
+    account_currencies = build_account_currencies_mapping(ledger.all_entries)
+
+    for entry in entries:
+        if isinstance(entry, data.Open):
+            ensure_account_balance_type(
+                entry.account,
+                account_to_type_mapping,
+                balance_type_config,
+                default_balance_type,
+            )
+        elif isinstance(entry, data.Balance):
+            if not is_original_entry(entry) or entry.amount.number is None:
+                continue
+            ensure_account_balance_type(
+                entry.account,
+                account_to_type_mapping,
+                balance_type_config,
+                default_balance_type,
+            )
+            bean_tab_balance = BeanTabBalance(
+                account=entry.account,
+                currency=entry.amount.currency,
+                date=entry.date.isoformat(),
+                number=float(entry.amount.number),
+                type=BalanceType.REGULAR,
+            )
+            balances.append(bean_tab_balance.to_dict())
+
+        elif isinstance(entry, data.Custom) and entry.type == "valuation":
+            if not is_original_entry(entry):
+                continue
+            try:
+                parsed = parse_valuation_entry(entry)
+            except ValuationError:
+                continue
+
+            ensure_account_balance_type(
+                parsed.account,
+                account_to_type_mapping,
+                balance_type_config,
+                default_balance_type,
+            )
+            bean_tab_balance = BeanTabBalance(
+                account=parsed.account,
+                currency=parsed.amount.currency,
+                date=entry.date.isoformat(),
+                number=float(parsed.amount.number),
+                type=BalanceType.VALUATION,
+            )
+            balances.append(bean_tab_balance.to_dict())
+
+        elif isinstance(entry, data.Custom) and entry.type == "balance-ext":
+            if not is_original_entry(entry):
+                continue
+            try:
+                parsed = parse_balance_extended_entry(
+                    entry,
+                    account_to_type_mapping,
+                    balance_type_config,
+                    default_balance_type,
+                )
+            except BalanceExtendedError:
+                continue
+
+            balance_type_map = {
+                BalanceType.REGULAR: BalanceType.REGULAR,
+                BalanceType.FULL: BalanceType.REGULAR,
+                BalanceType.PADDED: BalanceType.PADDED,
+                BalanceType.FULL_PADDED: BalanceType.PADDED,
+                BalanceType.VALUATION: BalanceType.VALUATION,
+            }
+            balance_type_for_display = balance_type_map.get(
+                parsed.balance_type, BalanceType.PADDED
+            )
+            asserted_amounts = parsed.amount_values
+            if parsed.balance_type in (BalanceType.FULL, BalanceType.FULL_PADDED):
+                # TODO: proper implementation will need more consideration
+                continue
+                # all_currencies = account_currencies.get(parsed.account, set())
+                # asserted_amounts.extend([Amount(0.0, currency) for currency in all_currencies - set(asserted_amounts)])
+
+            for amount_obj in asserted_amounts:
+                bean_tab_balance = BeanTabBalance(
+                    account=parsed.account,
+                    currency=amount_obj.currency,
+                    date=entry.date.isoformat(),
+                    number=float(amount_obj.number),
+                    type=balance_type_for_display,
+                )
+                balances.append(bean_tab_balance.to_dict())
+
+    # Per-account currencies: from Open directive when declared, else from balances
+    account_currencies_list: Dict[str, List[str]] = {}
+    for account in account_to_type_mapping:
+        currencies = account_currencies.get(account, set())
+        if currencies:
+            account_currencies_list[account] = sorted(currencies)
+        else:
+            from_balances = {
+                b["currency"]
+                for b in balances
+                if b["account"] == account
+            }
+            account_currencies_list[account] = sorted(from_balances)
+
+    accounts = [
+        BeanTabAccount(
+            account=account,
+            defaultBalanceType=balance_type,
+            currencies=account_currencies_list.get(account, []),
+        ).to_dict()
+        for account, balance_type in sorted(account_to_type_mapping.items())
+    ]
+
+    # Collect BalanceErrors from ledger (balance check failures) for table highlighting
+    balance_errors: List[dict] = []
+    for err in ledger.errors:
+        if isinstance(err, BeancountBalanceError) and getattr(err, "entry", None):
+            entry = err.entry
+            balance_errors.append({
+                "account": entry.account,
+                "date": entry.date.isoformat(),
+                "currency": entry.amount.currency if entry.amount else None,
+                "message": err.message,
+            })
+
+    balances_by_date: Dict[str, List[dict]] = defaultdict(list)
+    for b in balances:
+        balances_by_date[b["date"]].append(b)
+
+    dates = sorted(balances_by_date)
+    return BalancesIndex(
+        dates=dates,
+        balances_by_date=dict(balances_by_date),
+        accounts=accounts,
+        balance_errors=balance_errors,
+        series=build_series(b for date in dates for b in balances_by_date[date]),
+    )
@@ -0,0 +1,79 @@
+"""Resampled balance history for many accounts at once."""
+
+from __future__ import annotations
+
+import calendar
+import datetime
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+PERIODS = ("day", "week", "month", "quarter", "year")
+
+# (account, currency) -> (ascending ISO dates, balance numbers)
+SeriesByKey = Dict[Tuple[str, str], Tuple[List[str], List[float]]]
+
+
+def period_end(date: datetime.date, period: str) -> datetime.date:
+    """Return the last day of the period containing *date* (Sunday for weeks)."""
+    if period == "day":
+        return date
+    if period == "week":
+        return date + datetime.timedelta(days=6 - date.weekday())
+    if period == "month":
+        return date.replace(day=calendar.monthrange(date.year, date.month)[1])
+    if period == "quarter":
+        month = (date.month - 1) // 3 * 3 + 3
+        return datetime.date(date.year, month, calendar.monthrange(date.year, month)[1])
+    if period == "year":
+        return datetime.date(date.year, 12, 31)
+    raise ValueError(f"Unknown period: {period} (expected one of {', '.join(PERIODS)})")
+
+
+def period_end_dates(start: datetime.date, end: datetime.date, period: str) -> List[str]:
+    """Return ISO dates of the ends of all periods (Sunday for weeks) within [start, end]."""
+    if start > end:
+        raise ValueError(f"start {start} is after end {end}")
+    dates: List[str] = []
+    current = period_end(start, period)
+    while current <= end:
+        dates.append(current.isoformat())
+        current = period_end(current + datetime.timedelta(days=1), period)
+    return dates
+
+
+def forward_fill(
+    series_dates: Sequence[str],
+    series_values: Sequence[float],
+    sample_dates: Sequence[str],
+) -> List[Optional[float]]:
+    """Sample a step series at each of *sample_dates* (both ascending).
+
+    Each sample is the last value on or before its date, None before the first one.
+    """
+    result: List[Optional[float]] = []
+    idx = -1
+    n = len(series_dates)
+    for date in sample_dates:
+        while idx + 1 < n and series_dates[idx + 1] <= date:
+            idx += 1
+        result.append(series_values[idx] if idx >= 0 else None)
+    return result
+
+
+def build_series(balances: Iterable[dict]) -> SeriesByKey:
+    """Group BeanTabBalance dicts (in ascending date order) by (account, currency).
+
+    When several balances share a date the first one is kept, as in the grid.
+    """
+    series: SeriesByKey = {}
+    for b in balances:
+        dates, values = series.setdefault((b["account"], b["currency"]), ([], []))
+        if dates and dates[-1] == b["date"]:
+            continue
+        dates.append(b["date"])
+        values.append(b["number"])
+    return series
@@ -0,0 +1,68 @@
+"""Opt-in CPU and allocation profiling of single BeanTab endpoint calls."""
+
+from __future__ import annotations
+
+import cProfile
+import logging
+import threading
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+from typing import NamedTuple
+from typing import TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Subdirectory of the ledger directory that dumps are written to
+PROFILE_DIR_NAME = "beantab-profiles"
+
+# cProfile and tracemalloc are process-wide: profile one call at a time
+_profile_lock = threading.Lock()
+
+
+class ProfileDumps(NamedTuple):
+    """Files written for one profiled call."""
+
+    cpu: Path  # cProfile stats, load with pstats.Stats
+    memory: Path  # tracemalloc snapshot, load with tracemalloc.Snapshot.load
+
+
+def profile_call(func: Callable[[], T], dump_dir: Path, name: str) -> tuple[T, ProfileDumps]:
+    """Run *func* under cProfile and tracemalloc and dump both to *dump_dir*.
+
+    *dump_dir* is created if missing, with a ``.gitignore`` so that dumps don't show up
+    as uncommitted changes in the ledger's repository. Concurrent calls are serialized.
+    Dumps are written even when *func* raises. Returns ``(result, dumps)``.
+    """
+    dump_dir.mkdir(parents=True, exist_ok=True)
+    gitignore = dump_dir / ".gitignore"
+    if not gitignore.exists():
+        gitignore.write_text("*\n")
+
+    with _profile_lock:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        base = dump_dir / f"beantab-profile-{name}-{stamp}"
+        dumps = ProfileDumps(cpu=base.with_suffix(".prof"), memory=base.with_suffix(".tracemalloc"))
+
+        # Don't stop tracing that somebody else started
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            result = func()
+        finally:
+            profiler.disable()
+            snapshot = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+
+            profiler.dump_stats(str(dumps.cpu))
+            snapshot.dump(str(dumps.memory))
+            logger.info("BeanTab profile of %s written to %s and %s", name, dumps.cpu, dumps.memory)
+
+    return result, dumps
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from pathlib import Path
+from textwrap import dedent
+from types import SimpleNamespace
+from typing import Callable
+
+import pytest
+from beancount.loader import load_string
+from flask import Flask
+
+from beantab import BeanTab
+
+# Balances on four dates; the 2024-03-10 assertion fails.
+LEDGER = """
+2024-01-01 open Assets:Cash USD
+2024-01-01 open Assets:Bank EUR
+2024-01-01 open Equity:Opening
+
+2024-01-02 * "Opening"
+  Assets:Cash  10 USD
+  Equity:Opening
+
+2024-01-10 balance Assets:Cash  10 USD
+2024-02-10 balance Assets:Cash  10 USD
+2024-03-10 balance Assets:Cash  99 USD
+2024-04-10 balance Assets:Cash  10 USD
+2024-04-10 balance Assets:Bank  0 EUR
+"""
+
+
+@pytest.fixture
+def make_beantab(tmp_path: Path) -> Callable[..., BeanTab]:
+    """Build a BeanTab extension over a ledger given as a string."""
+
+    def make(ledger: str = LEDGER, config: str | None = None) -> BeanTab:
+        entries, errors, _options = load_string(dedent(ledger))
+        fake_ledger = SimpleNamespace(
+            all_entries=entries,
+            errors=errors,
+            beancount_file_path=str(tmp_path / "main.beancount"),
+        )
+        return BeanTab(fake_ledger, config)
+
+    return make
+
+
+@pytest.fixture
+def app() -> Flask:
+    return Flask(__name__)
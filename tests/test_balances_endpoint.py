@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from flask import Flask
+
+from beantab import BeanTab
+
+
+def _get(app: Flask, ext: BeanTab, query: str):
+    with app.test_request_context(f"/balances?{query}"):
+        return ext.api_balances()
+
+
+def _dates(data: dict) -> list[str]:
+    return sorted({b["date"] for b in data["balances"]})
+
+
+class TestBalancesPaging:
+    def test_without_limit_returns_everything(self, app, make_beantab) -> None:
+        response = _get(app, make_beantab(), "")
+
+        assert response["success"]
+        data = response["data"]
+        assert len(data["balances"]) == 5
+        assert "nextCursor" not in data
+        assert [a["account"] for a in data["accounts"]] == ["Assets:Bank", "Assets:Cash", "Equity:Opening"]
+        assert [e["date"] for e in data["balanceErrors"]] == ["2024-03-10"]
+
+    def test_first_chunk_has_newest_dates(self, app, make_beantab) -> None:
+        data = _get(app, make_beantab(), "limit=2")["data"]
+
+        assert _dates(data) == ["2024-03-10", "2024-04-10"]
+        assert data["nextCursor"] == "2024-03-10"
+        assert [e["date"] for e in data["balanceErrors"]] == ["2024-03-10"]
+        assert len(data["accounts"]) == 3
+
+    def test_last_chunk_has_no_cursor(self, app, make_beantab) -> None:
+        data = _get(app, make_beantab(), "limit=2&before=2024-03-10")["data"]
+
+        assert _dates(data) == ["2024-01-10", "2024-02-10"]
+        assert data["nextCursor"] is None
+        assert data["balanceErrors"] == []
+
+    def test_chunks_cover_all_dates_once(self, app, make_beantab) -> None:
+        ext = make_beantab()
+        seen: list[str] = []
+        cursor = None
+        while True:
+            query = "limit=3" + (f"&before={cursor}" if cursor else "")
+            data = _get(app, ext, query)["data"]
+            seen.extend(_dates(data))
+            cursor = data["nextCursor"]
+            if cursor is None:
+                break
+
+        assert sorted(seen) == ["2024-01-10", "2024-02-10", "2024-03-10", "2024-04-10"]
+        assert len(seen) == len(set(seen))
+
+    def test_cursor_older_than_every_date(self, app, make_beantab) -> None:
+        data = _get(app, make_beantab(), "limit=2&before=2023-01-01")["data"]
+
+        assert data["balances"] == []
+        assert data["nextCursor"] is None
+
+    def test_invalid_limit(self, app, make_beantab) -> None:
+        ext = make_beantab()
+        for limit in ("abc", "0", "-1"):
+            body, status = _get(app, ext, f"limit={limit}")
+            assert status == 500
+            assert not body["success"]
+            assert "limit" in body["error"]
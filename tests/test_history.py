@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import datetime
+
+import pytest
+
+from beantab.history import build_series
+from beantab.history import forward_fill
+from beantab.history import period_end_dates
+
+
+class TestPeriodEndDates:
+    @pytest.mark.parametrize(
+        ("period", "end", "expected"),
+        [
+            ("month", datetime.date(2024, 4, 15), ["2024-01-31", "2024-02-29", "2024-03-31"]),
+            ("quarter", datetime.date(2024, 4, 15), ["2024-03-31"]),
+            ("week", datetime.date(2024, 1, 20), ["2024-01-07", "2024-01-14"]),
+        ],
+    )
+    def test_period_ends_within_range(self, period: str, end: datetime.date, expected: list[str]) -> None:
+        assert period_end_dates(datetime.date(2024, 1, 1), end, period) == expected
+
+    def test_rejects_unknown_period(self) -> None:
+        with pytest.raises(ValueError):
+            period_end_dates(datetime.date(2024, 1, 1), datetime.date(2024, 2, 1), "fortnight")
+
+    def test_rejects_reversed_range(self) -> None:
+        with pytest.raises(ValueError):
+            period_end_dates(datetime.date(2024, 2, 1), datetime.date(2024, 1, 1), "month")
+
+
+class TestForwardFill:
+    def test_samples_last_value_on_or_before_each_date(self) -> None:
+        values = forward_fill(
+            ["2024-01-15", "2024-03-31"],
+            [10.0, 30.0],
+            ["2024-01-01", "2024-01-31", "2024-02-29", "2024-03-31"],
+        )
+        assert values == [None, 10.0, 10.0, 30.0]
+
+
+class TestBuildSeries:
+    def test_groups_by_account_and_currency_keeping_first_per_date(self) -> None:
+        balances = [
+            {"account": "Assets:Cash", "currency": "USD", "date": "2024-01-01", "number": 1.0},
+            {"account": "Assets:Cash", "currency": "USD", "date": "2024-01-01", "number": 2.0},
+            {"account": "Assets:Cash", "currency": "EUR", "date": "2024-01-01", "number": 3.0},
+            {"account": "Assets:Cash", "currency": "USD", "date": "2024-02-01", "number": 4.0},
+        ]
+        assert build_series(balances) == {
+            ("Assets:Cash", "USD"): (["2024-01-01", "2024-02-01"], [1.0, 4.0]),
+            ("Assets:Cash", "EUR"): (["2024-01-01"], [3.0]),
+        }
+
+
+def _history(app, ext, query: str):
+    with app.test_request_context(f"/history?{query}"):
+        return ext.api_history()
+
+
+def _series(data: dict) -> dict[tuple[str, str], list]:
+    return {(s["account"], s["currency"]): s["values"] for s in data["series"]}
+
+
+class TestHistoryEndpoint:
+    def test_defaults_to_month_ends_over_whole_history(self, app, make_beantab) -> None:
+        response = _history(app, make_beantab(), "")
+
+        assert response["success"]
+        data = response["data"]
+        # The last balance (2024-04-10) is inside the last month
+        assert data["dates"] == ["2024-01-31", "2024-02-29", "2024-03-31", "2024-04-30"]
+        assert _series(data) == {
+            ("Assets:Bank", "EUR"): [None, None, None, 0.0],
+            ("Assets:Cash", "USD"): [10.0, 10.0, 99.0, 10.0],
+        }
+
+    def test_default_end_includes_partial_last_period(self, app, make_beantab) -> None:
+        ext = make_beantab()
+
+        assert _history(app, ext, "period=quarter")["data"]["dates"] == ["2024-03-31", "2024-06-30"]
+        assert _history(app, ext, "period=year")["data"]["dates"] == ["2024-12-31"]
+
+    def test_explicit_range(self, app, make_beantab) -> None:
+        data = _history(app, make_beantab(), "start=2024-02-01&end=2024-03-31")["data"]
+
+        assert data["dates"] == ["2024-02-29", "2024-03-31"]
+        assert _series(data)[("Assets:Cash", "USD")] == [10.0, 99.0]
+
+    def test_single_bound_outside_history_is_empty(self, app, make_beantab) -> None:
+        ext = make_beantab()
+        for query in ["start=2030-01-01", "end=2023-06-30"]:
+            response = _history(app, ext, query)
+
+            assert response["success"], query
+            assert response["data"]["dates"] == []
+            assert _series(response["data"]) == {
+                ("Assets:Bank", "EUR"): [],
+                ("Assets:Cash", "USD"): [],
+            }
+
+    def test_filters_accounts_and_currencies(self, app, make_beantab) -> None:
+        ext = make_beantab()
+
+        by_account = _history(app, ext, "account=^Assets:Ba")["data"]
+        assert list(_series(by_account)) == [("Assets:Bank", "EUR")]
+
+        by_currency = _history(app, ext, "currency=USD")["data"]
+        assert list(_series(by_currency)) == [("Assets:Cash", "USD")]
+
+        several = _history(app, ext, "account=Bank&account=Cash&currency=EUR")["data"]
+        assert list(_series(several)) == [("Assets:Bank", "EUR")]
+
+    def test_empty_ledger(self, app, make_beantab) -> None:
+        data = _history(app, make_beantab("2024-01-01 open Assets:Cash USD\n"), "")["data"]
+
+        assert data == {"dates": [], "series": []}
+
+    def test_invalid_parameters(self, app, make_beantab) -> None:
+        ext = make_beantab()
+        for query, message in [
+            ("period=fortnight", "Invalid period"),
+            ("start=2024-13-01", "month"),
+            ("end=yesterday", "isoformat"),
+            ("start=2024-03-01&end=2024-01-01", "after"),
+            ("account=(", "Invalid account pattern"),
+        ]:
+            body, status = _history(app, ext, query)
+            assert status == 500, query
+            assert not body["success"]
+            assert message in body["error"], (query, body["error"])
@@ -0,0 +1,50 @@
+"""Import-time benchmark: Fava imports beantab on startup, keep that cheap."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+
+# Modules that must only be imported on first endpoint use
+LAZY_MODULES = [
+    "beantab.balances",
+    "beantab.BeantabFileManager",
+    "beantab.profiling",
+    "beancount.parser.parser",
+    "beancount_lazy_plugins.balance_extended.common",
+    "beancount_lazy_plugins.valuation.common",
+]
+
+# Generous upper bound for importing beantab itself once Fava and Flask are loaded
+IMPORT_TIME_BUDGET_SECONDS = 0.2
+
+_MEASURE_IMPORT = """
+import json, sys, time
+import fava.ext, fava.helpers, flask
+before = set(sys.modules)
+start = time.perf_counter()
+import beantab
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "modules": sorted(set(sys.modules) - before)}))
+"""
+
+
+def _measure_import() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", _MEASURE_IMPORT],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+def test_import_does_not_load_heavy_modules() -> None:
+    imported = set(_measure_import()["modules"])
+    assert imported.isdisjoint(LAZY_MODULES), sorted(imported & set(LAZY_MODULES))
+
+
+def test_import_time_within_budget() -> None:
+    elapsed = min(_measure_import()["elapsed"] for _ in range(3))
+    assert elapsed < IMPORT_TIME_BUDGET_SECONDS, f"import beantab took {elapsed:.3f}s"
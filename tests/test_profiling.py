@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import pstats
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from beantab import profiled
+from beantab.profiling import PROFILE_DIR_NAME
+from beantab.profiling import profile_call
+
+
+class TestProfileCall:
+    def test_writes_cpu_and_memory_dumps(self, tmp_path: Path) -> None:
+        result, dumps = profile_call(lambda: [str(i) for i in range(1000)], tmp_path, "api_balances")
+
+        assert len(result) == 1000
+        assert dumps.cpu.parent == tmp_path
+        assert dumps.cpu.name.startswith("beantab-profile-api_balances-")
+        assert pstats.Stats(str(dumps.cpu)).total_calls > 0
+        assert tracemalloc.Snapshot.load(str(dumps.memory)).traces is not None
+        assert not tracemalloc.is_tracing()
+
+    def test_writes_dumps_when_call_fails(self, tmp_path: Path) -> None:
+        def fail() -> None:
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            profile_call(fail, tmp_path, "api_update_balances")
+
+        assert len(list(tmp_path.glob("*.prof"))) == 1
+        assert len(list(tmp_path.glob("*.tracemalloc"))) == 1
+
+    def test_ignores_dumps_in_git(self, tmp_path: Path) -> None:
+        dump_dir = tmp_path / PROFILE_DIR_NAME
+        profile_call(lambda: None, dump_dir, "api_balances")
+
+        assert (dump_dir / ".gitignore").read_text() == "*\n"
+
+    def test_overlapping_calls(self, tmp_path: Path) -> None:
+        results: dict[str, object] = {}
+
+        def run(name: str, delay: float) -> None:
+            try:
+                results[name], _dumps = profile_call(lambda: time.sleep(delay) or name, tmp_path, name)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                results[name] = exc
+
+        threads = [
+            threading.Thread(target=run, args=("fast", 0.2)),
+            threading.Thread(target=run, args=("slow", 0.5)),
+        ]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.05)
+        for thread in threads:
+            thread.join()
+
+        assert results == {"fast": "fast", "slow": "slow"}
+        assert len(list(tmp_path.glob("*.prof"))) == 2
+        assert len(list(tmp_path.glob("*.tracemalloc"))) == 2
+        assert not tracemalloc.is_tracing()
+
+    def test_keeps_existing_tracing(self, tmp_path: Path) -> None:
+        tracemalloc.start()
+        try:
+            profile_call(lambda: None, tmp_path, "api_balances")
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+
+
+@profiled
+def _endpoint(self) -> dict:
+    return {"answer": 42}
+
+
+def _profile_dumps(tmp_path: Path) -> list[Path]:
+    return sorted((tmp_path / PROFILE_DIR_NAME).glob("*.prof"))
+
+
+class TestProfiled:
+    def test_off_by_default(self, app, make_beantab, tmp_path: Path) -> None:
+        ext = make_beantab()
+        with app.test_request_context("/?profile=1"):
+            assert _endpoint(ext) == {"answer": 42}
+
+        assert _profile_dumps(tmp_path) == []
+
+    @pytest.mark.parametrize("setting", ["'once'", "True"])
+    def test_once_profiles_first_call_only(self, app, make_beantab, tmp_path: Path, setting: str) -> None:
+        ext = make_beantab(config=f"{{'profile': {setting}}}")
+        with app.test_request_context("/"):
+            assert _endpoint(ext) == {"answer": 42}
+            assert _endpoint(ext) == {"answer": 42}
+
+        assert len(_profile_dumps(tmp_path)) == 1
+
+    def test_request_mode_needs_query_flag(self, app, make_beantab, tmp_path: Path) -> None:
+        ext = make_beantab(config="{'profile': 'request'}")
+        with app.test_request_context("/"):
+            assert _endpoint(ext) == {"answer": 42}
+        assert _profile_dumps(tmp_path) == []
+
+        with app.test_request_context("/?profile=1"):
+            assert _endpoint(ext) == {"answer": 42}
+            assert _endpoint(ext) == {"answer": 42}
+        assert len(_profile_dumps(tmp_path)) == 2
+
+    def test_unknown_setting_disables_profiling(self, app, make_beantab, tmp_path: Path) -> None:
+        ext = make_beantab(config="{'profile': 'always'}")
+        with app.test_request_context("/?profile=1"):
+            _endpoint(ext)
+
+        assert _profile_dumps(tmp_path) == []
+
+    def test_profiled_endpoint_returns_response(self, app, make_beantab, tmp_path: Path) -> None:
+        ext = make_beantab(config="{'profile': 'once'}")
+        with app.test_request_context("/balances"):
+            response = ext.api_balances()
+
+        assert response["success"]
+        assert len(response["data"]["balances"]) == 5
+        assert len(_profile_dumps(tmp_path)) == 1